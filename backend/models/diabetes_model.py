@@ -1,20 +1,56 @@
-from pydantic import BaseModel, validator
-from typing import Optional, List
-from datetime import datetime
-import math
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
+from typing import Optional, List, Literal, Tuple
+import base64
+import bisect
+import numpy as np
+
+# Mifflin-St Jeor coefficients: (intercept, per kg, per cm, per year of age)
+BMR_COEFFICIENTS = {
+    "male": (5.0, 10.0, 6.25, -5.0),
+    "female": (-161.0, 10.0, 6.25, -5.0),
+}
+
+ACTIVITY_MULTIPLIERS = {
+    "sedentary": 1.2,
+    "light": 1.375,
+    "moderate": 1.55,
+    "active": 1.725,
+    "very_active": 1.9
+}
+
+RISK_LEVELS = ("low", "moderate", "high")
+
+# Category thresholds: a value at an edge falls in the higher category
+BMI_EDGES = (18.5, 25.0, 30.0)
+BMI_LABELS = ("underweight", "normal", "overweight", "obese")
+DIABETES_LABELS = ("normal", "prediabetic", "diabetic")
+FASTING_GLUCOSE_EDGES = (100.0, 126.0)  # mg/dL
+A1C_EDGES = (5.7, 6.5)  # %
+
+# Time-series fields of SimulationResult
+SERIES_FIELDS = (
+    "time_points", "glucose", "insulin", "glucagon", "glp1",
+    "beta_cells", "alpha_cells", "optimal_glucose"
+)
+
+# Series a client can ask for by name; time_points always comes along
+SeriesName = Literal[
+    "glucose", "insulin", "glucagon", "glp1",
+    "beta_cells", "alpha_cells", "optimal_glucose"
+]
 
 class PatientData(BaseModel):
     name: str
-    age: int
-    weight: float  # kg
-    height: float  # cm
+    age: int = Field(ge=1, le=120)
+    weight: float = Field(ge=1, le=500)  # kg
+    height: float = Field(ge=30, le=250)  # cm
     gender: str
     diabetes_type: Optional[str] = None  # "normal", "prediabetic", "diabetic"
     obesity_level: Optional[str] = None  # "normal", "overweight", "obese"
     meal_frequency: int = 3
     sugar_intake: Optional[float] = None  # g/day
     exercise_level: Optional[str] = "moderate"
-    medications: List[str] = []
+    medications: Tuple[str, ...] = ()
     fasting_glucose: Optional[float] = None  # mg/dL
     a1c_level: Optional[float] = None  # %
     activity_level: Optional[str] = "sedentary"  # "sedentary", "light", "moderate", "active"
@@ -26,25 +62,8 @@ class PatientData(BaseModel):
     bmi_category: Optional[str] = None
     diabetes_risk: Optional[str] = None
     
-    @validator('age')
-    def validate_age(cls, v):
-        if v < 1 or v > 120:
-            raise ValueError('Age must be between 1 and 120')
-        return v
-    
-    @validator('weight')
-    def validate_weight(cls, v):
-        if v < 1 or v > 500:
-            raise ValueError('Weight must be between 1 and 500 kg')
-        return v
-    
-    @validator('height')
-    def validate_height(cls, v):
-        if v < 30 or v > 250:
-            raise ValueError('Height must be between 30 and 250 cm')
-        return v
-    
-    @validator('gender')
+    @field_validator('gender')
+    @classmethod
     def validate_gender(cls, v):
         if v.lower() not in ['male', 'female', 'm', 'f']:
             raise ValueError('Gender must be male, female, m, or f')
@@ -57,34 +76,14 @@ class PatientData(BaseModel):
         self.bmi = round(self.weight / (height_m ** 2), 1)
         
         # Determine BMI category
-        if self.bmi < 18.5:
-            self.bmi_category = "underweight"
-            self.obesity_level = "underweight"
-        elif self.bmi < 25:
-            self.bmi_category = "normal"
-            self.obesity_level = "normal"
-        elif self.bmi < 30:
-            self.bmi_category = "overweight"
-            self.obesity_level = "overweight"
-        else:
-            self.bmi_category = "obese"
-            self.obesity_level = "obese"
+        self.bmi_category = BMI_LABELS[bisect.bisect_right(BMI_EDGES, self.bmi)]
+        self.obesity_level = self.bmi_category
         
         # Estimate diabetes type if not provided
         if not self.diabetes_type and self.fasting_glucose:
-            if self.fasting_glucose < 100:
-                self.diabetes_type = "normal"
-            elif self.fasting_glucose < 126:
-                self.diabetes_type = "prediabetic"
-            else:
-                self.diabetes_type = "diabetic"
+            self.diabetes_type = DIABETES_LABELS[bisect.bisect_right(FASTING_GLUCOSE_EDGES, self.fasting_glucose)]
         elif not self.diabetes_type and self.a1c_level:
-            if self.a1c_level < 5.7:
-                self.diabetes_type = "normal"
-            elif self.a1c_level < 6.5:
-                self.diabetes_type = "prediabetic"
-            else:
-                self.diabetes_type = "diabetic"
+            self.diabetes_type = DIABETES_LABELS[bisect.bisect_right(A1C_EDGES, self.a1c_level)]
         elif not self.diabetes_type:
             self.diabetes_type = "normal"  # Default
         
@@ -93,67 +92,34 @@ class PatientData(BaseModel):
     
     def _calculate_diabetes_risk(self) -> str:
         """Calculate diabetes risk based on multiple factors"""
-        risk_score = 0
-        
-        # Age factor
-        if self.age >= 45:
-            risk_score += 2
-        elif self.age >= 35:
-            risk_score += 1
-        
-        # BMI factor
-        if self.bmi >= 30:
-            risk_score += 3
-        elif self.bmi >= 25:
-            risk_score += 2
-        
-        # Family history
-        if self.family_history:
-            risk_score += 2
-        
-        # Activity level
-        if self.activity_level == "sedentary":
-            risk_score += 1
-        
-        # Smoking
-        if self.smoking_status == "smoker":
-            risk_score += 1
-        
         # Current diabetes status
         if self.diabetes_type == "diabetic":
             return "high"
         elif self.diabetes_type == "prediabetic":
             return "moderate"
         
-        # Risk assessment
-        if risk_score >= 6:
-            return "high"
-        elif risk_score >= 3:
-            return "moderate"
-        else:
-            return "low"
+        # Age (+1 from 35, +2 from 45), BMI (+2 from 25, +3 from 30), family
+        # history (+2), sedentary lifestyle (+1) and smoking (+1)
+        risk_score = (
+            (self.age >= 35) + (self.age >= 45) +
+            2 * (self.bmi >= 25) + (self.bmi >= 30) +
+            2 * bool(self.family_history) +
+            (self.activity_level == "sedentary") +
+            (self.smoking_status == "smoker")
+        )
+        
+        # Risk assessment: <3 low, 3-5 moderate, >=6 high
+        return RISK_LEVELS[(risk_score >= 3) + (risk_score >= 6)]
 
 class SimulationParams(BaseModel):
     patient_data: PatientData
-    simulation_hours: int = 24
-    food_factor: float = 1.0
+    simulation_hours: int = Field(default=24, ge=1, le=168)  # Max 1 week
+    food_factor: float = Field(default=1.0, ge=0.1, le=5.0)
     palmitic_factor: float = 1.0
     drug_dosage: float = 0.0
     show_optimal: bool = True
-    meal_times: List[float] = [0, 6, 12, 18]  # Hours when meals occur
-    exercise_times: List[float] = []  # Hours when exercise occurs
-    
-    @validator('simulation_hours')
-    def validate_simulation_hours(cls, v):
-        if v < 1 or v > 168:  # Max 1 week
-            raise ValueError('Simulation hours must be between 1 and 168')
-        return v
-    
-    @validator('food_factor')
-    def validate_food_factor(cls, v):
-        if v < 0.1 or v > 5.0:
-            raise ValueError('Food factor must be between 0.1 and 5.0')
-        return v
+    meal_times: Tuple[float, ...] = (0.0, 6.0, 12.0, 18.0)  # Hours when meals occur
+    exercise_times: Tuple[float, ...] = ()  # Hours when exercise occurs
 
 class SimulationResult(BaseModel):
     time_points: List[float]
@@ -171,23 +137,34 @@ class SimulationResult(BaseModel):
     recommendations: List[str]
     risk_factors: List[str]
     
+    # float64 copy of glucose shared by the numeric summaries; never serialized
+    _glucose_array: Optional[np.ndarray] = PrivateAttr(default=None)
+    
+    def glucose_array(self) -> np.ndarray:
+        """Glucose series as a float64 array, converted from the list at most once"""
+        if self._glucose_array is None:
+            self._glucose_array = np.asarray(self.glucose, dtype=np.float64)
+        return self._glucose_array
+    
     def generate_summary(self):
         """Generate simulation summary statistics"""
         if not self.glucose:
             return
         
-        import statistics
+        glucose = self.glucose_array()
         
         # Glucose statistics
-        avg_glucose = round(statistics.mean(self.glucose), 1)
-        max_glucose = round(max(self.glucose), 1)
-        min_glucose = round(min(self.glucose), 1)
-        glucose_variability = round(statistics.stdev(self.glucose), 1)
-        
-        # Time in range (70-180 mg/dL for general population)
-        time_in_range = sum(1 for g in self.glucose if 70 <= g <= 180) / len(self.glucose) * 100
-        time_above_range = sum(1 for g in self.glucose if g > 180) / len(self.glucose) * 100
-        time_below_range = sum(1 for g in self.glucose if g < 70) / len(self.glucose) * 100
+        avg_glucose = round(float(glucose.mean()), 1)
+        max_glucose = round(float(glucose.max()), 1)
+        min_glucose = round(float(glucose.min()), 1)
+        glucose_variability = round(float(glucose.std(ddof=1)), 1)
+        
+        # Time in range (70-180 mg/dL for general population); in-range is what's left
+        below = int(np.count_nonzero(glucose < 70))
+        above = int(np.count_nonzero(glucose > 180))
+        time_below_range = below / glucose.size * 100
+        time_above_range = above / glucose.size * 100
+        time_in_range = (glucose.size - below - above) / glucose.size * 100
         
         self.simulation_summary = {
             "average_glucose": avg_glucose,
@@ -200,6 +177,16 @@ class SimulationResult(BaseModel):
             "estimated_a1c": self.a1c_estimate
         }
 
+    def to_f32_payload(self, exclude: frozenset = frozenset()) -> dict:
+        """Compact form: each series as base64 of little-endian float32, other fields as-is"""
+        payload = self.model_dump(exclude=set(SERIES_FIELDS))
+        payload["series_f32_b64"] = {
+            name: base64.b64encode(np.asarray(values, dtype="<f4").tobytes()).decode("ascii")
+            for name in SERIES_FIELDS
+            if name not in exclude and (values := getattr(self, name)) is not None
+        }
+        return payload
+
 class ValidationResponse(BaseModel):
     bmi: float
     bmi_category: str
@@ -232,23 +219,14 @@ class HealthMetrics(BaseModel):
     @staticmethod
     def calculate_bmr(weight: float, height: float, age: int, gender: str) -> float:
         """Calculate Basal Metabolic Rate using Mifflin-St Jeor equation"""
-        if gender.lower() in ['male', 'm']:
-            bmr = 10 * weight + 6.25 * height - 5 * age + 5
-        else:
-            bmr = 10 * weight + 6.25 * height - 5 * age - 161
+        sex = "male" if gender.lower() in ['male', 'm'] else "female"
+        c0, c_weight, c_height, c_age = BMR_COEFFICIENTS[sex]
+        bmr = c0 + c_weight * weight + c_height * height + c_age * age
         
         return round(bmr, 0)
     
     @staticmethod
     def calculate_daily_calories(bmr: float, activity_level: str) -> float:
         """Calculate daily calorie needs based on activity level"""
-        activity_multipliers = {
-            "sedentary": 1.2,
-            "light": 1.375,
-            "moderate": 1.55,
-            "active": 1.725,
-            "very_active": 1.9
-        }
-        
-        multiplier = activity_multipliers.get(activity_level, 1.375)
+        multiplier = ACTIVITY_MULTIPLIERS.get(activity_level, 1.375)
         return round(bmr * multiplier, 0)
\ No newline at end of file
@@ -1,63 +1,324 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse, FileResponse
-from models.diabetes_model import PatientData, SimulationParams, SimulationResult, HealthMetrics
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import FileResponse, ORJSONResponse
+from models.diabetes_model import SERIES_FIELDS, SeriesName, SimulationParams, SimulationResult
 from utils.ode_solver import DiabetesODESolver
+from pydantic import BaseModel
+import orjson
+from typing import Literal, Optional
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # Redis is optional; fall back to the in-process cache only
+    aioredis = None
+    RedisError = Exception
 import traceback
 import json
+import csv
+import io
 import os
+import heapq
+import time
+import asyncio
+import functools
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import uuid
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Cache bounds: least-recently-used entries are evicted past MAX_CACHE_ENTRIES,
+# and entries older than SIMULATION_TTL seconds expire
+MAX_CACHE_ENTRIES = 1024
+SIMULATION_TTL = 2 * 60 * 60
+
+def _encode_default(obj):
+    """orjson fallback for values it can't serialize natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return str(obj)
+
+def entry_size(value) -> int:
+    """Size of a cache entry as its serialized JSON length in bytes"""
+    return len(orjson.dumps(value, default=_encode_default))
+
+class SimulationLRU:
+    """Bounded in-memory store for simulation results with LRU and TTL eviction"""
+
+    def __init__(self, max_entries: int = MAX_CACHE_ENTRIES, ttl: float = SIMULATION_TTL):
+        self.max = max_entries
+        self.ttl = ttl
+        self._od = OrderedDict()  # sim_id -> (entry, expires_at, size, created_at)
+        self._heap = []           # (expires_at, sim_id), may hold stale items
+        self._bytes = 0
+
+    def put(self, sim_id: str, value, ttl: float = None, size: int = None):
+        """Insert or refresh an entry, evicting the least recently used on overflow"""
+        self.cleanup()
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        if size is None:
+            size = entry_size(value)
+
+        if sim_id in self._od:
+            self._bytes -= self._od[sim_id][2]
+        self._od[sim_id] = (value, expires_at, size, now)
+        self._od.move_to_end(sim_id)
+        self._bytes += size
+        heapq.heappush(self._heap, (expires_at, sim_id))
+
+        while len(self._od) > self.max:
+            _, evicted = self._od.popitem(last=False)
+            self._bytes -= evicted[2]
+
+        # Drop stale heap items left behind by LRU evictions and refreshes
+        if len(self._heap) > 2 * self.max:
+            self._heap = [(item[1], key) for key, item in self._od.items()]
+            heapq.heapify(self._heap)
+
+    def get(self, sim_id: str):
+        """Return the cached entry (or None) and mark it as recently used"""
+        self.cleanup()
+        item = self._od.get(sim_id)
+        if item is None:
+            return None
+        self._od.move_to_end(sim_id)
+        return item[0]
+
+    def _is_live(self, expires_at: float, sim_id: str) -> bool:
+        item = self._od.get(sim_id)
+        return item is not None and item[1] == expires_at
+
+    def cleanup(self):
+        """Remove expired entries; only touches the heap items that have expired"""
+        now = time.time()
+        while self._heap and self._heap[0][0] < now:
+            expires_at, sim_id = heapq.heappop(self._heap)
+            if self._is_live(expires_at, sim_id):
+                self._bytes -= self._od.pop(sim_id)[2]
+
+    def clear(self):
+        self._od.clear()
+        self._heap.clear()
+        self._bytes = 0
+
+    def values(self):
+        return (item[0] for item in self._od.values())
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def oldest_timestamp(self):
+        """Insertion time of the oldest live entry (the next to expire under the default TTL)"""
+        self.cleanup()
+        while self._heap and not self._is_live(*self._heap[0]):
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return datetime.fromtimestamp(self._od[self._heap[0][1]][3])
+
+    def __contains__(self, sim_id: str) -> bool:
+        return self.get(sim_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._od)
+
+class SharedCache:
+    """SimulationLRU in front of an optional Redis tier shared by all workers"""
+
+    def __init__(self, local: SimulationLRU, prefix: str, encode=None, decode=None):
+        self.local = local
+        self.prefix = prefix
+        self.encode = encode or (lambda value: orjson.dumps(value, default=_encode_default))
+        self.decode = decode or orjson.loads
+
+    async def get(self, key: str):
+        """Return the entry from the local tier, falling back to Redis on a miss"""
+        value = self.local.get(key)
+        if value is not None or redis_client is None:
+            return value
+        try:
+            raw = await redis_client.get(self.prefix + key)
+        except RedisError as e:
+            logger.error("Redis get error: %s", e)
+            return None
+        if raw is None:
+            return None
+        value = self.decode(raw)
+        self.local.put(key, value, size=len(raw))
+        return value
+
+    async def put(self, key: str, value):
+        """Store the entry locally and, when configured, in Redis"""
+        if redis_client is None:
+            self.local.put(key, value)
+            return
+        # The Redis encoding doubles as the local size estimate
+        encoded = self.encode(value)
+        self.local.put(key, value, size=len(encoded))
+        try:
+            await redis_client.setex(self.prefix + key, REDIS_TTL, encoded)
+        except RedisError as e:
+            logger.error("Redis set error: %s", e)
+
+    async def clear(self):
+        self.local.clear()
+        if redis_client is None:
+            return
+        try:
+            keys = [key async for key in redis_client.scan_iter(match=self.prefix + "*")]
+            if keys:
+                await redis_client.delete(*keys)
+        except RedisError as e:
+            logger.error("Redis clear error: %s", e)
+
+# Redis is optional: set REDIS_URL to share results between workers. The local
+# tier then only absorbs bursts of repeated reads for L1_TTL seconds.
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_TTL = 60 * 60
+L1_MAX_ENTRIES = 256
+L1_TTL = 1.0
+
+redis_client = aioredis.Redis.from_url(REDIS_URL) if aioredis is not None and REDIS_URL else None
+
+def _new_local_cache() -> SimulationLRU:
+    if redis_client is None:
+        return SimulationLRU()
+    return SimulationLRU(max_entries=L1_MAX_ENTRIES, ttl=L1_TTL)
+
+def _decode_simulation(raw: bytes) -> dict:
+    entry = orjson.loads(raw)
+    return {
+        "result": SimulationResult.model_construct(**entry["result"]),
+        "timestamp": datetime.fromisoformat(entry["timestamp"]),
+        "params": SimulationParams.model_validate(entry["params"])
+    }
+
 # In-memory storage for simulation results (use database in production)
-simulation_cache = {}
+simulation_cache = _new_local_cache()
+simulation_store = SharedCache(simulation_cache, "sim:", decode=_decode_simulation)
+
+# Maps a content hash of the request parameters to the simulation_id that answered it
+params_index = _new_local_cache()
+params_store = SharedCache(params_index, "simparams:")
+
+CACHE_SWEEP_INTERVAL = 60.0
+
+async def sweep_expired_entries(interval: float = CACHE_SWEEP_INTERVAL):
+    """Drop expired entries periodically so an idle worker still releases their memory"""
+    while True:
+        await asyncio.sleep(interval)
+        simulation_cache.cleanup()
+        params_index.cleanup()
 
-@router.post("/run", response_model=SimulationResult)
-async def run_simulation(params: SimulationParams):
+def params_key(params: SimulationParams) -> str:
+    """Hash the canonical JSON of the request so identical submissions share one run"""
+    payload = orjson.dumps(params.model_dump(), option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+# ODE solves are CPU-bound; run them here so the event loop keeps serving requests.
+# The cores are split between server worker processes (WEB_CONCURRENCY).
+SIM_POOL = ThreadPoolExecutor(
+    max_workers=max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", "1"))),
+    thread_name_prefix="simulation"
+)
+
+async def run_in_sim_pool(func, *args, **kwargs):
+    """Run a blocking simulation function on SIM_POOL and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(SIM_POOL, functools.partial(func, *args, **kwargs))
+
+def _run_solver(params: SimulationParams) -> SimulationResult:
+    """Prepare patient data and run a single simulation (blocking)"""
+    patient_data = params.patient_data
+    patient_data.calculate_derived_values()
+    
+    solver = DiabetesODESolver(patient_data)
+    return solver.simulate(
+        hours=params.simulation_hours,
+        food_factor=params.food_factor,
+        palmitic_factor=params.palmitic_factor,
+        drug_dosage=params.drug_dosage,
+        meal_times=params.meal_times,
+        exercise_times=params.exercise_times
+    )
+
+async def run_distinct(param_sets: list[SimulationParams]) -> list[SimulationResult]:
+    """Solve each distinct parameter set once, concurrently, and fan the results back out"""
+    keys = [params_key(params) for params in param_sets]
+    pending = {}
+    for key, params in zip(keys, param_sets):
+        if key not in pending:
+            pending[key] = run_in_sim_pool(_run_solver, params)
+    solved = dict(zip(pending, await asyncio.gather(*pending.values())))
+    return [solved[key] for key in keys]
+
+def series_payload(result: SimulationResult, series_format: str) -> dict:
+    """Result as a plain dict for embedding in multi-result responses"""
+    return result.to_f32_payload() if series_format == "f32" else result.model_dump()
+
+def simulation_response(result: SimulationResult, series_format: str,
+                        series: Optional[list[str]] = None) -> Response:
+    """Serialize a result directly, skipping FastAPI's re-validation of every series value"""
+    # Unrequested series are never converted or encoded
+    exclude = frozenset(SERIES_FIELDS) - {"time_points", *series} if series else frozenset()
+    if series_format == "f32":
+        return ORJSONResponse(result.to_f32_payload(exclude))
+    return Response(result.model_dump_json(exclude=set(exclude)), media_type="application/json")
+
+@router.post("/run", response_model=None, responses={200: {"model": SimulationResult}})
+async def run_simulation(params: SimulationParams, series_format: Literal["json", "f32"] = "json",
+                         series: Optional[list[SeriesName]] = Query(None)):
     """Run diabetes simulation with enhanced parameters"""
     try:
-        # Validate and prepare patient data
-        patient_data = params.patient_data
-        patient_data.calculate_derived_values()
+        # Identical parameters always produce the same trajectory; reuse it
+        key = params_key(params)
+        cached_id = await params_store.get(key)
+        cached_result = await simulation_store.get(cached_id) if cached_id else None
+        if cached_result is not None:
+            return simulation_response(cached_result["result"], series_format, series)
         
-        # Create solver and run simulation
-        solver = DiabetesODESolver(patient_data)
-        result = solver.simulate(
-            hours=params.simulation_hours,
-            food_factor=params.food_factor,
-            palmitic_factor=params.palmitic_factor,
-            drug_dosage=params.drug_dosage,
-            meal_times=params.meal_times,
-            exercise_times=params.exercise_times
-        )
+        # Run the simulation off the event loop
+        result = await run_in_sim_pool(_run_solver, params)
         
-        # Store result in cache with unique ID
+        # Add simulation ID to result
         simulation_id = str(uuid.uuid4())
-        simulation_cache[simulation_id] = {
+        result.simulation_summary["simulation_id"] = simulation_id
+        
+        # Store result in cache with unique ID
+        await simulation_store.put(simulation_id, {
             "result": result,
             "timestamp": datetime.now(),
             "params": params
-        }
+        })
         
-        # Add simulation ID to result
-        result.simulation_summary["simulation_id"] = simulation_id
+        await params_store.put(key, simulation_id)
         
-        return result
+        return simulation_response(result, series_format, series)
         
     except Exception as e:
         print(f"Simulation error: {e}")
         print(traceback.format_exc())
         raise HTTPException(status_code=400, detail=f"Simulation failed: {str(e)}")
 
-@router.get("/result/{simulation_id}")
-async def get_simulation_result(simulation_id: str):
+async def get_cached_simulation(simulation_id: str, detail: str = "Simulation result not found") -> dict:
+    """Look up a cached simulation entry or raise 404"""
+    cached_result = await simulation_store.get(simulation_id)
+    if cached_result is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return cached_result
+
+@router.get("/result/{simulation_id}", response_model=None, responses={200: {"model": SimulationResult}})
+async def get_simulation_result(simulation_id: str, series_format: Literal["json", "f32"] = "json",
+                                series: Optional[list[SeriesName]] = Query(None)):
     """Retrieve a cached simulation result"""
-    if simulation_id not in simulation_cache:
-        raise HTTPException(status_code=404, detail="Simulation result not found")
-    
-    cached_result = simulation_cache[simulation_id]
-    return cached_result["result"]
+    return simulation_response((await get_cached_simulation(simulation_id))["result"], series_format, series)
 
 @router.post("/compare")
 async def compare_simulations(simulation_ids: list[str]):
@@ -65,11 +326,10 @@ async def compare_simulations(simulation_ids: list[str]):
     if len(simulation_ids) < 2:
         raise HTTPException(status_code=400, detail="At least 2 simulations required for comparison")
     
-    results = []
-    for sim_id in simulation_ids:
-        if sim_id not in simulation_cache:
-            raise HTTPException(status_code=404, detail=f"Simulation {sim_id} not found")
-        results.append(simulation_cache[sim_id]["result"])
+    results = [
+        (await get_cached_simulation(sim_id, f"Simulation {sim_id} not found"))["result"]
+        for sim_id in simulation_ids
+    ]
     
     # Generate comparison data
     comparison = {
@@ -81,38 +341,28 @@ async def compare_simulations(simulation_ids: list[str]):
     return comparison
 
 @router.post("/batch-simulate")
-async def batch_simulate(simulation_list: list[SimulationParams]):
+async def batch_simulate(simulation_list: list[SimulationParams], series_format: Literal["json", "f32"] = "json"):
     """Run multiple simulations for comparison or analysis"""
     try:
-        results = []
-        
-        for params in simulation_list:
-            # Validate and prepare patient data
-            patient_data = params.patient_data
-            patient_data.calculate_derived_values()
-            
-            # Create solver and run simulation
-            solver = DiabetesODESolver(patient_data)
-            result = solver.simulate(
-                hours=params.simulation_hours,
-                food_factor=params.food_factor,
-                palmitic_factor=params.palmitic_factor,
-                drug_dosage=params.drug_dosage,
-                meal_times=params.meal_times,
-                exercise_times=params.exercise_times
-            )
-            
-            results.append(result)
+        # Independent simulations run concurrently on the pool
+        results = await run_distinct(simulation_list)
         
-        return {"results": results, "count": len(results)}
+        return ORJSONResponse({
+            "results": [series_payload(result, series_format) for result in results],
+            "count": len(results)
+        })
         
     except Exception as e:
         print(f"Batch simulation error: {e}")
         raise HTTPException(status_code=400, detail=f"Batch simulation failed: {str(e)}")
 
+# SimulationParams fields /sensitivity-analysis may vary
+SENSITIVITY_PARAMETERS = ("food_factor", "drug_dosage", "exercise_times")
+
 @router.post("/sensitivity-analysis")
 async def sensitivity_analysis(base_params: SimulationParams, 
-                             parameter_ranges: dict = None):
+                             parameter_ranges: dict = None,
+                             series_format: Literal["json", "f32"] = "json"):
     """Perform sensitivity analysis by varying parameters"""
     try:
         if parameter_ranges is None:
@@ -123,45 +373,35 @@ async def sensitivity_analysis(base_params: SimulationParams,
                 "exercise_times": [[], [14], [10, 16]]  # No exercise, afternoon, morning+evening
             }
         
-        results = []
+        variations = []
+        base_fields = base_params.model_dump()
         
         for param_name, param_values in parameter_ranges.items():
             for value in param_values:
-                # Create modified parameters
-                modified_params = base_params.copy(deep=True)
-                
-                if param_name == "food_factor":
-                    modified_params.food_factor = value
-                elif param_name == "drug_dosage":
-                    modified_params.drug_dosage = value
-                elif param_name == "exercise_times":
-                    modified_params.exercise_times = value
-                
-                # Run simulation
-                solver = DiabetesODESolver(modified_params.patient_data)
-                result = solver.simulate(
-                    hours=modified_params.simulation_hours,
-                    food_factor=modified_params.food_factor,
-                    palmitic_factor=modified_params.palmitic_factor,
-                    drug_dosage=modified_params.drug_dosage,
-                    meal_times=modified_params.meal_times,
-                    exercise_times=modified_params.exercise_times
-                )
+                # Create modified parameters, validated so that e.g. exercise_times
+                # becomes a tuple and hashes like any other request
+                update = {param_name: value} if param_name in SENSITIVITY_PARAMETERS else {}
+                modified_params = SimulationParams.model_validate({**base_fields, **update})
                 
-                results.append({
-                    "parameter": param_name,
-                    "value": value,
-                    "result": result
-                })
+                variations.append((param_name, value, modified_params))
         
-        return {"sensitivity_results": results}
+        # Run all variations concurrently on the pool; the defaults repeat the
+        # base scenario once per parameter, which only needs solving once
+        simulated = await run_distinct([modified for _, _, modified in variations])
+        
+        results = [
+            {"parameter": param_name, "value": value, "result": series_payload(result, series_format)}
+            for (param_name, value, _), result in zip(variations, simulated)
+        ]
+        
+        return ORJSONResponse({"sensitivity_results": results})
         
     except Exception as e:
         print(f"Sensitivity analysis error: {e}")
         raise HTTPException(status_code=400, detail=f"Sensitivity analysis failed: {str(e)}")
 
 @router.post("/intervention-analysis")
-async def intervention_analysis(params: SimulationParams):
+async def intervention_analysis(params: SimulationParams, series_format: Literal["json", "f32"] = "json"):
     """Analyze the effect of different interventions"""
     try:
         interventions = [
@@ -172,11 +412,11 @@ async def intervention_analysis(params: SimulationParams):
             {"name": "Combined", "food_factor": 0.8, "drug_dosage": 0.5, "exercise_times": [14]}
         ]
         
-        results = []
         solver = DiabetesODESolver(params.patient_data)
         
-        for intervention in interventions:
-            result = solver.simulate(
+        simulated = await asyncio.gather(*(
+            run_in_sim_pool(
+                solver.simulate,
                 hours=params.simulation_hours,
                 food_factor=intervention["food_factor"],
                 palmitic_factor=params.palmitic_factor,
@@ -184,12 +424,13 @@ async def intervention_analysis(params: SimulationParams):
                 meal_times=params.meal_times,
                 exercise_times=intervention["exercise_times"]
             )
-            
-            results.append({
-                "intervention": intervention["name"],
-                "parameters": intervention,
-                "result": result
-            })
+            for intervention in interventions
+        ))
+        
+        results = [
+            {"intervention": intervention["name"], "parameters": intervention, "result": result}
+            for intervention, result in zip(interventions, simulated)
+        ]
         
         # Calculate intervention effectiveness
         baseline_a1c = results[0]["result"].a1c_estimate
@@ -203,61 +444,35 @@ async def intervention_analysis(params: SimulationParams):
                 "effectiveness_score": min(100, max(0, a1c_reduction * 20))  # Scale to 0-100
             })
         
-        return {
+        for result in results:
+            result["result"] = series_payload(result["result"], series_format)
+        
+        return ORJSONResponse({
             "intervention_results": results,
             "effectiveness_ranking": sorted(effectiveness, key=lambda x: x["a1c_reduction"], reverse=True)
-        }
+        })
         
     except Exception as e:
         print(f"Intervention analysis error: {e}")
         raise HTTPException(status_code=400, detail=f"Intervention analysis failed: {str(e)}")
 
-@router.post("/export-json/{simulation_id}")
-async def export_simulation_json(simulation_id: str):
-    """Export simulation result as JSON"""
-    if simulation_id not in simulation_cache:
-        raise HTTPException(status_code=404, detail="Simulation result not found")
-    
-    cached_result = simulation_cache[simulation_id]
-    
-    # Create export data
+def _export_json(simulation_id: str, cached_result: dict) -> str:
+    """Write the simulation metadata, inputs and results as JSON"""
     export_data = {
         "simulation_metadata": {
             "simulation_id": simulation_id,
             "timestamp": cached_result["timestamp"].isoformat(),
             "software_version": "1.0.0"
         },
-        "patient_data": cached_result["params"].patient_data.dict(),
-        "simulation_parameters": cached_result["params"].dict(),
-        "results": cached_result["result"].dict()
+        "patient_data": cached_result["params"].patient_data.model_dump(),
+        "simulation_parameters": cached_result["params"].model_dump(),
+        "results": cached_result["result"].model_dump()
     }
-    
-    # Save to temporary file
-    filename = f"simulation_{simulation_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    filepath = f"/tmp/{filename}"
-    
-    with open(filepath, 'w') as f:
-        json.dump(export_data, f, indent=2, default=str)
-    
-    return FileResponse(
-        filepath,
-        media_type='application/json',
-        filename=filename
-    )
+    return json.dumps(export_data, indent=2, default=str)
 
-@router.post("/export-csv/{simulation_id}")
-async def export_simulation_csv(simulation_id: str):
-    """Export simulation result as CSV"""
-    if simulation_id not in simulation_cache:
-        raise HTTPException(status_code=404, detail="Simulation result not found")
-    
-    cached_result = simulation_cache[simulation_id]
+def _export_csv(simulation_id: str, cached_result: dict) -> str:
+    """Write the simulated time series as CSV"""
     result = cached_result["result"]
-    
-    # Create CSV content
-    import csv
-    import io
-    
     output = io.StringIO()
     writer = csv.writer(output)
     
@@ -268,49 +483,53 @@ async def export_simulation_csv(simulation_id: str):
     ])
     
     # Write data
-    for i in range(len(result.time_points)):
-        writer.writerow([
-            result.time_points[i],
-            result.glucose[i],
-            result.insulin[i],
-            result.glucagon[i],
-            result.glp1[i],
-            result.beta_cells[i],
-            result.alpha_cells[i]
-        ])
+    writer.writerows(zip(
+        result.time_points, result.glucose, result.insulin, result.glucagon,
+        result.glp1, result.beta_cells, result.alpha_cells
+    ))
+    return output.getvalue()
+
+# Export format -> (writer, media type)
+_EXPORTERS = {
+    "json": (_export_json, "application/json"),
+    "csv": (_export_csv, "text/csv"),
+}
+
+@router.post("/export-{export_format}/{simulation_id}")
+async def export_simulation(export_format: Literal["json", "csv"], simulation_id: str):
+    """Export simulation result as JSON or CSV"""
+    write, media_type = _EXPORTERS[export_format]
+    cached_result = await get_cached_simulation(simulation_id)
     
     # Save to temporary file
-    filename = f"simulation_{simulation_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    filename = f"simulation_{simulation_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
     filepath = f"/tmp/{filename}"
     
     with open(filepath, 'w', newline='') as f:
-        f.write(output.getvalue())
+        f.write(write(simulation_id, cached_result))
     
     return FileResponse(
         filepath,
-        media_type='text/csv',
+        media_type=media_type,
         filename=filename
     )
 
 @router.delete("/clear-cache")
 async def clear_simulation_cache():
     """Clear all cached simulation results"""
-    global simulation_cache
     count = len(simulation_cache)
-    simulation_cache.clear()
+    await simulation_store.clear()
+    await params_store.clear()
     return {"message": f"Cleared {count} cached simulations"}
 
-@router.get("/cache-status")
+@router.get("/cache-status", response_model=None)
 async def get_cache_status():
     """Get simulation cache status"""
-    return {
+    return ORJSONResponse({
         "cached_simulations": len(simulation_cache),
-        "cache_size_mb": sum(len(str(v)) for v in simulation_cache.values()) / (1024 * 1024),
-        "oldest_simulation": min(
-            (v["timestamp"] for v in simulation_cache.values()),
-            default=None
-        )
-    }
+        "cache_size_mb": simulation_cache.total_bytes / (1024 * 1024),
+        "oldest_simulation": simulation_cache.oldest_timestamp
+    })
 
 def _generate_comparison_metrics(results: list[SimulationResult]) -> dict:
     """Generate metrics for comparing multiple simulation results"""
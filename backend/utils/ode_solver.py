@@ -1,8 +1,359 @@
 import numpy as np
-from scipy.integrate import odeint, solve_ivp
-from models.diabetes_model import PatientData, SimulationResult, HealthMetrics
+import scipy
+from scipy.integrate import solve_ivp
+from models.diabetes_model import PatientData, SimulationResult
 import math
 import warnings
+import threading
+import contextlib
+from types import MappingProxyType
+
+try:
+    from numba import njit
+except ImportError:
+    # Without numba the RHS still works, it just runs as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Before SciPy 1.17, LSODA kept global Fortran state, so overlapping solves from the
+# simulation pool fail with IntegratorConcurrencyError; serialize them there
+SCIPY_VERSION = tuple(int(part) for part in scipy.__version__.split(".")[:2])
+LSODA_LOCK = threading.Lock() if SCIPY_VERSION < (1, 17) else contextlib.nullcontext()
+
+# LSODA reports repeated error-test failures as warnings before giving up and
+# _integrate falls back to BDF. Filtered once here: catch_warnings() around each
+# solve swaps the process-wide filter list and races across pool threads.
+warnings.filterwarnings("ignore", message="lsoda:", category=UserWarning, module=r"scipy\.integrate")
+
+# Order of the model parameters in the packed float64 array handed to _rhs
+PARAM_NAMES = (
+    'K_L', 'K_U2', 'K_U4', 'K_I',
+    'lambda_tilde_A', 'lambda_tilde_B', 'gamma_L', 'lambda_IB', 'lambda_U4_I',
+    'lambda_U2C', 'lambda_CA', 'gamma_G', 'gamma_G_star', 'gamma_O', 'gamma_P',
+    'gamma_P_hat', 'lambda_GU4', 'lambda_G_star_U2', 'lambda_T_alpha',
+    'lambda_T_alpha_P', 'mu_A', 'mu_B', 'mu_LB', 'mu_LA', 'mu_I', 'mu_U4',
+    'mu_U2', 'mu_C', 'mu_T_alpha', 'mu_O', 'mu_P', 'mu_IG', 'gamma_1',
+    'gamma_2', 'xi_1', 'xi_2', 'xi_3', 'xi_4', 'eta_T_alpha', 'I_hypo', 'L_0',
+    'K_hat_L', 'K_hat_O', 'obesity_factor',
+)
+
+# Integer positions into the packed array (compile-time constants for numba)
+(K_L, K_U2, K_U4, K_I,
+ lambda_tilde_A, lambda_tilde_B, gamma_L, lambda_IB, lambda_U4_I,
+ lambda_U2C, lambda_CA, gamma_G, gamma_G_star, gamma_O, gamma_P,
+ gamma_P_hat, lambda_GU4, lambda_G_star_U2, lambda_T_alpha,
+ lambda_T_alpha_P, mu_A, mu_B, mu_LB, mu_LA, mu_I, mu_U4,
+ mu_U2, mu_C, mu_T_alpha, mu_O, mu_P, mu_IG, gamma_1,
+ gamma_2, xi_1, xi_2, xi_3, xi_4, eta_T_alpha, I_hypo, L_0,
+ K_hat_L, K_hat_O, obesity_factor) = range(len(PARAM_NAMES))
+
+DEFAULT_MEAL_TIMES = (0.0, 6.0, 12.0, 18.0)
+
+# Half-saturation dose of the GLP-1 agonist / SGLT2 drug effects
+DRUG_K_D = 1e-7
+
+def pack_parameters(params: dict) -> np.ndarray:
+    """Pack a parameter dict into the contiguous float64 layout used by _rhs"""
+    return np.fromiter((params[name] for name in PARAM_NAMES), dtype=np.float64, count=len(PARAM_NAMES))
+
+@njit(inline='always', fastmath=True, error_model='numpy')
+def _rhs_core(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times,
+              drug_on, exercise_on, out):
+    """
+    Right-hand side of the 12-variable model on a packed parameter array, written into out
+    Variables: [L, A, B, I, U2, U4, C, G, G_star, O, P, T_alpha]
+    drug_on/exercise_on are literal constants in the specialized variants below,
+    so the compiler removes the drug and exercise branches they switch off
+    """
+    L = y[0]
+    A = y[1]
+    B = y[2]
+    I = y[3]
+    U2 = y[4]
+    U4 = y[5]
+    C = y[6]
+    G = y[7]
+    G_star = y[8]
+    O = y[9]
+    P = y[10]
+    T_alpha = y[11]
+
+    # Food intake timing (meals with 1.5 hour duration) and post-meal storage (3 hours)
+    t_mod = t % 24.0
+    food_active = False
+    storage_active = False
+    for mt in meal_times:
+        food_active |= mt <= t_mod <= mt + 1.5
+        storage_active |= mt <= t_mod <= mt + 3.0
+    # Meal switches as multipliers, so the intake terms below are branch-free
+    intake = food_factor if food_active else 0.0
+    storage = 1.0 if storage_active else 0.0
+
+    # Exercise increases glucose uptake for 2 hours
+    exercise_factor = 1.0
+    if exercise_on:
+        for et in exercise_times:
+            if et <= t <= et + 2.0:
+                exercise_factor = 1.5
+                break
+
+    # Drug receptor occupancy D / (K_D + D), shared by the GLP-1 and glucose terms
+    drug_occupancy = drug_dose / (DRUG_K_D + drug_dose) if drug_on else 0.0
+
+    # Equation for GLP-1 (L)
+    lambda_L = p[gamma_L] * intake
+    dL_dt = lambda_L - p[mu_LB] * B * L - p[mu_LA] * A * L
+
+    # Enhanced GLP-1 by drug (for GLP-1 agonists)
+    if drug_on:
+        dL_dt += lambda_L * drug_occupancy
+
+    # Equation for β-cells (B)
+    L_term = max(0.0, L - p[L_0])
+    dB_dt = (p[lambda_tilde_B] * L_term / (p[K_L] + L_term) -
+             p[mu_B] * B * (1 + p[xi_1] * G + p[xi_2] * P))
+
+    # Equation for α-cells (A)
+    I_term = max(0.0, p[I_hypo] - I)
+    dA_dt = (p[lambda_tilde_A] * I_term / (p[K_I] + I_term) *
+             (1 / (1 + L / p[K_hat_L])) -
+             p[mu_A] * A)
+
+    # Equation for insulin (I)
+    dI_dt = p[lambda_IB] * B - p[mu_I] * I - p[mu_IG] * G * I
+
+    # Equation for GLUT-2 (U2)
+    dU2_dt = p[lambda_U2C] * C - p[mu_U2] * U2
+
+    # Equation for GLUT-4 (U4) with exercise enhancement
+    dU4_dt = (p[lambda_U4_I] * I * exercise_factor *
+              (1 / (1 + p[eta_T_alpha] * T_alpha)) -
+              p[mu_U4] * U4)
+
+    # Equation for glucagon (C)
+    G_high_term = 1.0 if G - p[xi_4] > 0 else 0.0
+    G_low_term = 1.0 if p[xi_3] - G > 0 else 0.0
+    dC_dt = (p[lambda_CA] * A /
+             (1 + p[gamma_1] * G_high_term * L) *
+             (1 + p[gamma_2] * G_low_term * L) -
+             p[mu_C] * C)
+
+    # Equation for blood glucose (G) with exercise effects
+    lambda_G = p[gamma_G] * intake
+    lambda_G_star = p[gamma_G_star] * storage
+
+    # Reduce glucose intake if drug is present (SGLT2 inhibitors effect):
+    # 1 / (1 + D / K_D) is the unoccupied fraction
+    if drug_on:
+        lambda_G = lambda_G * (1.0 - drug_occupancy)
+
+    release = p[lambda_G_star_U2] * G_star * U2 / (p[K_U2] + U2)
+    uptake = p[lambda_GU4] * G * U4 * exercise_factor / (p[K_U4] + U4)
+    dG_dt = lambda_G - lambda_G_star * G + release - uptake
+
+    # Equation for stored glucose (G*)
+    dG_star_dt = lambda_G_star * G + uptake - release
+
+    # Equation for oleic acid (O)
+    lambda_O = p[gamma_O] * intake
+    dO_dt = lambda_O - p[mu_O] * O
+
+    # Equation for palmitic acid (P)
+    lambda_P = (p[gamma_P] + palmitic_factor * p[gamma_P_hat] * p[obesity_factor]) * intake
+    dP_dt = lambda_P - p[mu_P] * P
+
+    # Equation for TNF-α (T_alpha)
+    dT_alpha_dt = (p[lambda_T_alpha] +
+                   p[lambda_T_alpha_P] * P * (1 / (1 + O / p[K_hat_O])) -
+                   p[mu_T_alpha] * T_alpha)
+
+    out[0] = dL_dt
+    out[1] = dA_dt
+    out[2] = dB_dt
+    out[3] = dI_dt
+    out[4] = dU2_dt
+    out[5] = dU4_dt
+    out[6] = dC_dt
+    out[7] = dG_dt
+    out[8] = dG_star_dt
+    out[9] = dO_dt
+    out[10] = dP_dt
+    out[11] = dT_alpha_dt
+    return out
+
+@njit(cache=True, fastmath=True, nogil=True, error_model='numpy')
+def _rhs(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times):
+    """Generic RHS, deciding the drug and exercise terms at every call"""
+    return _rhs_core(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times,
+                     drug_dose > 0, len(exercise_times) > 0, np.empty(12))
+
+@njit(cache=True, fastmath=True, nogil=True, error_model='numpy')
+def _rhs_meals(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times):
+    """RHS specialized for no drug and no exercise"""
+    return _rhs_core(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times,
+                     False, False, np.empty(12))
+
+@njit(cache=True, fastmath=True, nogil=True, error_model='numpy')
+def _rhs_drug(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times):
+    """RHS specialized for drug treatment without exercise"""
+    return _rhs_core(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times,
+                     True, False, np.empty(12))
+
+@njit(cache=True, fastmath=True, nogil=True, error_model='numpy')
+def _rhs_exercise(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times):
+    """RHS specialized for exercise without drug treatment"""
+    return _rhs_core(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times,
+                     False, True, np.empty(12))
+
+@njit(cache=True, fastmath=True, nogil=True, error_model='numpy')
+def _rhs_drug_exercise(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times):
+    """RHS specialized for drug treatment with exercise"""
+    return _rhs_core(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times,
+                     True, True, np.empty(12))
+
+# (drug_on, exercise_on) -> specialized RHS
+RHS_VARIANTS = {
+    (False, False): _rhs_meals,
+    (True, False): _rhs_drug,
+    (False, True): _rhs_exercise,
+    (True, True): _rhs_drug_exercise,
+}
+
+def select_rhs(drug_dose: float, exercise_times: np.ndarray):
+    """Pick the RHS variant with the scenario's drug/exercise branches folded away"""
+    return RHS_VARIANTS[(drug_dose > 0, len(exercise_times) > 0)]
+
+# Relative forward-difference step, sqrt(machine epsilon)
+FD_STEP = 1.4901161193847656e-08
+
+@njit(inline='always', fastmath=True, error_model='numpy')
+def _jac_core(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times,
+              drug_on, exercise_on):
+    """
+    Forward-difference Jacobian of _rhs_core, evaluated entirely in compiled code.
+    Left to itself LSODA would call back into Python once per column.
+    """
+    f0 = _rhs_core(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times,
+                   drug_on, exercise_on, np.empty(12))
+    fj = np.empty(12)
+    jac = np.empty((12, 12))
+    yp = y.copy()
+    for j in range(12):
+        # States span ~20 orders of magnitude, so the step scales with each one
+        yp[j] = y[j] + FD_STEP * max(abs(y[j]), 1e-30)
+        h = yp[j] - y[j]
+        _rhs_core(t, yp, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times,
+                  drug_on, exercise_on, fj)
+        for i in range(12):
+            jac[i, j] = (fj[i] - f0[i]) / h
+        yp[j] = y[j]
+    return jac
+
+@njit(cache=True, fastmath=True, nogil=True, error_model='numpy')
+def _jac_meals(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times):
+    """Jacobian matching _rhs_meals"""
+    return _jac_core(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times,
+                     False, False)
+
+@njit(cache=True, fastmath=True, nogil=True, error_model='numpy')
+def _jac_drug(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times):
+    """Jacobian matching _rhs_drug"""
+    return _jac_core(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times,
+                     True, False)
+
+@njit(cache=True, fastmath=True, nogil=True, error_model='numpy')
+def _jac_exercise(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times):
+    """Jacobian matching _rhs_exercise"""
+    return _jac_core(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times,
+                     False, True)
+
+@njit(cache=True, fastmath=True, nogil=True, error_model='numpy')
+def _jac_drug_exercise(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times):
+    """Jacobian matching _rhs_drug_exercise"""
+    return _jac_core(t, y, p, food_factor, palmitic_factor, drug_dose, meal_times, exercise_times,
+                     True, True)
+
+# (drug_on, exercise_on) -> Jacobian of the matching RHS variant
+JAC_VARIANTS = {
+    (False, False): _jac_meals,
+    (True, False): _jac_drug,
+    (False, True): _jac_exercise,
+    (True, True): _jac_drug_exercise,
+}
+
+def select_jacobian(drug_dose: float, exercise_times: np.ndarray):
+    """Pick the Jacobian paired with select_rhs"""
+    return JAC_VARIANTS[(drug_dose > 0, len(exercise_times) > 0)]
+
+def warmup():
+    """Compile every RHS and Jacobian variant ahead of the first request (no-op cost without numba)"""
+    p = np.ones(len(PARAM_NAMES))
+    meals = np.asarray(DEFAULT_MEAL_TIMES)
+    for fn in (_rhs, *RHS_VARIANTS.values(), *JAC_VARIANTS.values()):
+        fn(0.0, np.ones(12), p, 1.0, 1.0, 0.0, meals, np.empty(0))
+
+# States reported in SimulationResult (G, I, C, L, B, A) and their unit conversions:
+# glucose mg/dL, insulin pmol/L, glucagon pg/mL, GLP-1 pmol/L, cells scaled for plotting
+SERIES_STATES = np.array([7, 3, 6, 0, 2, 1])
+SERIES_SCALES = np.array([180000, 6e15, 3.5e15, 1e15, 1e12, 1e12])[:, None]
+
+# Base parameters from the diabetes model paper; patients get an adjusted copy
+BASE_PARAMETERS = MappingProxyType({
+    # Half-saturation constants (g/cm³)
+    'K_L': 1.7e-14,      # GLP-1
+    'K_U2': 9.45e-6,     # GLUT-2
+    'K_U4': 2.78e-6,     # GLUT-4
+    'K_I': 2e-13,        # Insulin
+    
+    # Activation rates (d⁻¹)
+    'lambda_tilde_A': 0.35,      # α-cells
+    'lambda_tilde_B': 1.745e9,   # β-cells
+    'gamma_L': 1.98e-13,         # GLP-1 secretion
+    'lambda_IB': 1.26e-8,        # Insulin by β-cells
+    'lambda_U4_I': 4.17e7,       # GLUT-4 by insulin
+    'lambda_U2C': 6.6e10,        # GLUT-2 by glucagon
+    'lambda_CA': 1.65e-11,       # Glucagon by α-cells
+    'gamma_G': 0.017,            # Glucose secretion
+    'gamma_G_star': 11.1,        # Glucose elimination
+    'gamma_O': 1.46e-4,          # Oleic acid
+    'gamma_P': 1.83e-6,          # Palmitic acid
+    'gamma_P_hat': 5.72e-5,      # Obesity palmitic acid
+    
+    # Transport rates (d⁻¹)
+    'lambda_GU4': 1.548,         # Glucose by GLUT-4
+    'lambda_G_star_U2': 4.644,   # Liver glucose by GLUT-2
+    'lambda_T_alpha': 1.19e-9,   # TNF-α normal
+    'lambda_T_alpha_P': 3.26e-4, # TNF-α by palmitic
+    
+    # Decay rates (d⁻¹)
+    'mu_A': 8.32,         # α-cells
+    'mu_B': 8.32,         # β-cells
+    'mu_LB': 251,         # GLP-1 by β-cells
+    'mu_LA': 251,         # GLP-1 by α-cells
+    'mu_I': 198.04,       # Insulin
+    'mu_U4': 1.85,        # GLUT-4
+    'mu_U2': 4.62,        # GLUT-2
+    'mu_C': 166.22,       # Glucagon
+    'mu_T_alpha': 199,    # TNF-α
+    'mu_O': 13.68,        # Oleic acid
+    'mu_P': 12,           # Palmitic acid
+    'mu_IG': 6e5,         # Insulin by glucose
+    
+    # Switch parameters
+    'gamma_1': 1e-14,     # Glucagon blocking
+    'gamma_2': 1.2e-14,   # Glucagon inducing
+    'xi_1': 1e12,         # β-cell deactivation by glucose
+    'xi_2': 1e12,         # β-cell deactivation by palmitic
+    'xi_3': 1e-2,         # Glucose switch level (inhibition)
+    'xi_4': 1e-4,         # Glucose switch level (activation)
+    'eta_T_alpha': 1e10,  # TNF-α inhibition of GLUT-4
+    'I_hypo': 8e-14,      # Hypoglycemia insulin level
+    'L_0': 1.7e-14,       # GLP-1 threshold
+    'K_hat_L': 1.7e-14,   # GLP-1 inhibitory saturation
+    'K_hat_O': 1.36e-6,   # Oleic acid inhibitory saturation
+})
 
 class DiabetesODESolver:
     def __init__(self, patient_data: PatientData):
@@ -10,64 +361,12 @@ class DiabetesODESolver:
         # Calculate derived values
         self.patient_data.calculate_derived_values()
         self.params = self._calculate_parameters()
+        # Packed once; every simulate()/ode_system() call on this solver reuses it
+        self.packed_params = pack_parameters(self.params)
         
     def _calculate_parameters(self):
         """Calculate model parameters based on patient data with enhanced personalization"""
-        # Base parameters from the diabetes model paper
-        params = {
-            # Half-saturation constants (g/cm³)
-            'K_L': 1.7e-14,      # GLP-1
-            'K_U2': 9.45e-6,     # GLUT-2
-            'K_U4': 2.78e-6,     # GLUT-4
-            'K_I': 2e-13,        # Insulin
-            
-            # Activation rates (d⁻¹)
-            'lambda_tilde_A': 0.35,      # α-cells
-            'lambda_tilde_B': 1.745e9,   # β-cells
-            'gamma_L': 1.98e-13,         # GLP-1 secretion
-            'lambda_IB': 1.26e-8,        # Insulin by β-cells
-            'lambda_U4_I': 4.17e7,       # GLUT-4 by insulin
-            'lambda_U2C': 6.6e10,        # GLUT-2 by glucagon
-            'lambda_CA': 1.65e-11,       # Glucagon by α-cells
-            'gamma_G': 0.017,            # Glucose secretion
-            'gamma_G_star': 11.1,        # Glucose elimination
-            'gamma_O': 1.46e-4,          # Oleic acid
-            'gamma_P': 1.83e-6,          # Palmitic acid
-            'gamma_P_hat': 5.72e-5,      # Obesity palmitic acid
-            
-            # Transport rates (d⁻¹)
-            'lambda_GU4': 1.548,         # Glucose by GLUT-4
-            'lambda_G_star_U2': 4.644,   # Liver glucose by GLUT-2
-            'lambda_T_alpha': 1.19e-9,   # TNF-α normal
-            'lambda_T_alpha_P': 3.26e-4, # TNF-α by palmitic
-            
-            # Decay rates (d⁻¹)
-            'mu_A': 8.32,         # α-cells
-            'mu_B': 8.32,         # β-cells
-            'mu_LB': 251,         # GLP-1 by β-cells
-            'mu_LA': 251,         # GLP-1 by α-cells
-            'mu_I': 198.04,       # Insulin
-            'mu_U4': 1.85,        # GLUT-4
-            'mu_U2': 4.62,        # GLUT-2
-            'mu_C': 166.22,       # Glucagon
-            'mu_T_alpha': 199,    # TNF-α
-            'mu_O': 13.68,        # Oleic acid
-            'mu_P': 12,           # Palmitic acid
-            'mu_IG': 6e5,         # Insulin by glucose
-            
-            # Switch parameters
-            'gamma_1': 1e-14,     # Glucagon blocking
-            'gamma_2': 1.2e-14,   # Glucagon inducing
-            'xi_1': 1e12,         # β-cell deactivation by glucose
-            'xi_2': 1e12,         # β-cell deactivation by palmitic
-            'xi_3': 1e-2,         # Glucose switch level (inhibition)
-            'xi_4': 1e-4,         # Glucose switch level (activation)
-            'eta_T_alpha': 1e10,  # TNF-α inhibition of GLUT-4
-            'I_hypo': 8e-14,      # Hypoglycemia insulin level
-            'L_0': 1.7e-14,       # GLP-1 threshold
-            'K_hat_L': 1.7e-14,   # GLP-1 inhibitory saturation
-            'K_hat_O': 1.36e-6,   # Oleic acid inhibitory saturation
-        }
+        params = dict(BASE_PARAMETERS)
         
         # Patient-specific adjustments
         self._adjust_for_obesity(params)
@@ -217,93 +516,16 @@ class DiabetesODESolver:
         Variables: [L, A, B, I, U2, U4, C, G, G_star, O, P, T_alpha]
         """
         if meal_times is None:
-            meal_times = [0, 6, 12, 18]
+            meal_times = DEFAULT_MEAL_TIMES
         if exercise_times is None:
             exercise_times = []
         
-        L, A, B, I, U2, U4, C, G, G_star, O, P, T_alpha = y
-        
-        # Food intake timing (meals with 1.5 hour duration)
-        food_active = any(self.F(t % 24, mt, mt + 1.5) for mt in meal_times)
-        
-        # Exercise effects
-        exercise_factor = self.exercise_effect(t, exercise_times)
-        
-        # Equation for GLP-1 (L)
-        lambda_L = self.params['gamma_L'] * food_factor if food_active else 0
-        dL_dt = lambda_L - self.params['mu_LB'] * B * L - self.params['mu_LA'] * A * L
-        
-        # Enhanced GLP-1 by drug (for GLP-1 agonists)
-        if drug_dose > 0:
-            K_D = 1e-7
-            dL_dt += lambda_L * (drug_dose / (K_D + drug_dose))
-        
-        # Equation for β-cells (B)
-        L_term = max(0, L - self.params['L_0'])
-        dB_dt = (self.params['lambda_tilde_B'] * L_term / 
-                (self.params['K_L'] + L_term) - 
-                self.params['mu_B'] * B * (1 + self.params['xi_1'] * G + self.params['xi_2'] * P))
-        
-        # Equation for α-cells (A)
-        I_term = max(0, self.params['I_hypo'] - I)
-        dA_dt = (self.params['lambda_tilde_A'] * I_term / 
-                (self.params['K_I'] + I_term) * 
-                (1 / (1 + L / self.params['K_hat_L'])) - 
-                self.params['mu_A'] * A)
-        
-        # Equation for insulin (I)
-        dI_dt = self.params['lambda_IB'] * B - self.params['mu_I'] * I - self.params['mu_IG'] * G * I
-        
-        # Equation for GLUT-2 (U2)
-        dU2_dt = self.params['lambda_U2C'] * C - self.params['mu_U2'] * U2
-        
-        # Equation for GLUT-4 (U4) with exercise enhancement
-        dU4_dt = (self.params['lambda_U4_I'] * I * exercise_factor * 
-                 (1 / (1 + self.params['eta_T_alpha'] * T_alpha)) - 
-                 self.params['mu_U4'] * U4)
-        
-        # Equation for glucagon (C)
-        G_high_term = self.H(G - self.params['xi_4'])
-        G_low_term = self.H(self.params['xi_3'] - G)
-        dC_dt = (self.params['lambda_CA'] * A / 
-                (1 + self.params['gamma_1'] * G_high_term * L) * 
-                (1 + self.params['gamma_2'] * G_low_term * L) - 
-                self.params['mu_C'] * C)
-        
-        # Equation for blood glucose (G) with exercise effects
-        lambda_G = self.params['gamma_G'] * food_factor if food_active else 0
-        lambda_G_star = self.params['gamma_G_star'] if any(mt <= t % 24 <= mt + 3 for mt in meal_times) else 0
-        
-        # Reduce glucose intake if drug is present (SGLT2 inhibitors effect)
-        if drug_dose > 0:
-            K_hat_D = 1e-7
-            lambda_G = lambda_G / (1 + drug_dose / K_hat_D)
-        
-        dG_dt = (lambda_G - lambda_G_star * G + 
-                self.params['lambda_G_star_U2'] * G_star * U2 / (self.params['K_U2'] + U2) - 
-                self.params['lambda_GU4'] * G * U4 * exercise_factor / (self.params['K_U4'] + U4))
-        
-        # Equation for stored glucose (G*)
-        dG_star_dt = (lambda_G_star * G + 
-                     self.params['lambda_GU4'] * G * U4 * exercise_factor / (self.params['K_U4'] + U4) - 
-                     self.params['lambda_G_star_U2'] * G_star * U2 / (self.params['K_U2'] + U2))
-        
-        # Equation for oleic acid (O)
-        lambda_O = self.params['gamma_O'] * food_factor if food_active else 0
-        dO_dt = lambda_O - self.params['mu_O'] * O
-        
-        # Equation for palmitic acid (P)
-        lambda_P = ((self.params['gamma_P'] + 
-                    palmitic_factor * self.params['gamma_P_hat'] * self.params['obesity_factor']) * 
-                   food_factor if food_active else 0)
-        dP_dt = lambda_P - self.params['mu_P'] * P
-        
-        # Equation for TNF-α (T_alpha)
-        dT_alpha_dt = (self.params['lambda_T_alpha'] + 
-                      self.params['lambda_T_alpha_P'] * P * (1 / (1 + O / self.params['K_hat_O'])) - 
-                      self.params['mu_T_alpha'] * T_alpha)
-        
-        return [dL_dt, dA_dt, dB_dt, dI_dt, dU2_dt, dU4_dt, dC_dt, dG_dt, dG_star_dt, dO_dt, dP_dt, dT_alpha_dt]
+        return _rhs(
+            float(t), np.asarray(y, dtype=np.float64), self.packed_params,
+            food_factor, palmitic_factor, drug_dose,
+            np.asarray(meal_times, dtype=np.float64),
+            np.asarray(exercise_times, dtype=np.float64)
+        )
     
     def get_initial_conditions(self):
         """Get initial conditions based on patient data"""
@@ -382,28 +604,22 @@ class DiabetesODESolver:
         y0 = self.get_initial_conditions()
         
         try:
-            # Solve ODE system using solve_ivp for better numerical stability
-            result = solve_ivp(
-                lambda t, y: self.ode_system(t, y, food_factor, palmitic_factor, drug_dosage, meal_times, exercise_times),
-                [0, hours],
-                y0,
-                t_eval=t,
-                method='RK45',
-                rtol=1e-8,
-                atol=1e-10
+            # Only arrays and floats cross into the compiled RHS, never the parameter dict
+            rhs_args = (
+                self.packed_params,
+                float(food_factor), float(palmitic_factor), float(drug_dosage),
+                np.asarray(meal_times, dtype=np.float64),
+                np.asarray(exercise_times, dtype=np.float64),
             )
+            result = self._integrate(hours, t, np.asarray(y0, dtype=np.float64), rhs_args)
             
             if not result.success:
                 raise Exception(f"ODE solver failed: {result.message}")
             
-            # Extract variables
-            L, A, B, I, U2, U4, C, G, G_star, O, P, T_alpha = result.y
-            
-            # Convert to appropriate units for medical interpretation
-            glucose_mg_dl = G * 180000  # Convert to mg/dL (more accurate conversion)
-            insulin_pmol_l = I * 6e15   # Convert to pmol/L
-            glucagon_pg_ml = C * 3.5e15 # Convert to pg/mL
-            glp1_pmol_l = L * 1e15      # Convert to pmol/L
+            # Convert the reported states to medical units in one pass
+            series = result.y[SERIES_STATES] * SERIES_SCALES
+            glucose_mg_dl = series[0]
+            glucose, insulin, glucagon, glp1, beta_cells, alpha_cells = series.tolist()
             
             # Calculate A1C estimate (using more accurate formula)
             avg_glucose_mg_dl = np.mean(glucose_mg_dl)
@@ -423,17 +639,17 @@ class DiabetesODESolver:
             # Generate optimal glucose trajectory
             optimal_glucose = self._generate_optimal_glucose(t, meal_times)
             
-            # Create result object
-            result_obj = SimulationResult(
+            # Create result object; the series come straight from numpy, so skip per-float validation
+            result_obj = SimulationResult.model_construct(
                 time_points=t.tolist(),
-                glucose=glucose_mg_dl.tolist(),
-                insulin=insulin_pmol_l.tolist(),
-                glucagon=glucagon_pg_ml.tolist(),
-                glp1=glp1_pmol_l.tolist(),
-                beta_cells=(B * 1e12).tolist(),  # Scale for visualization
-                alpha_cells=(A * 1e12).tolist(),  # Scale for visualization
+                glucose=glucose,
+                insulin=insulin,
+                glucagon=glucagon,
+                glp1=glp1,
+                beta_cells=beta_cells,
+                alpha_cells=alpha_cells,
                 optimal_glucose=optimal_glucose,
-                a1c_estimate=round(a1c_estimate, 2),
+                a1c_estimate=round(float(a1c_estimate), 2),
                 diagnosis=diagnosis,
                 patient_info=self._get_patient_info(),
                 simulation_summary={},
@@ -441,8 +657,12 @@ class DiabetesODESolver:
                 risk_factors=self._identify_risk_factors()
             )
             
-            # Generate summary statistics
+            # Generate summary statistics from the array the series came from
+            result_obj._glucose_array = glucose_mg_dl
             result_obj.generate_summary()
+            # glucose_mg_dl is a row view that would pin the whole series block
+            # on every cached result; glucose_array() rebuilds from the list if needed
+            result_obj._glucose_array = None
             
             return result_obj
             
@@ -450,35 +670,48 @@ class DiabetesODESolver:
             print(f"ODE solver error: {e}")
             raise Exception(f"Simulation failed: {str(e)}")
     
+    def _integrate(self, hours, t, y0, rhs_args):
+        """Integrate the stiff system with LSODA, retrying with BDF if LSODA stalls"""
+        rhs = select_rhs(rhs_args[3], rhs_args[5])
+        jac = select_jacobian(rhs_args[3], rhs_args[5])
+        with LSODA_LOCK:
+            result = solve_ivp(
+                rhs, [0, hours], y0, t_eval=t, method='LSODA', jac=jac,
+                rtol=1e-8, atol=1e-10, args=rhs_args
+            )
+        
+        if not result.success:
+            # The meal on/off switches occasionally stall LSODA on long runs;
+            # BDF is slower but reliably gets through them
+            result = solve_ivp(
+                rhs, [0, hours], y0, t_eval=t, method='BDF',
+                rtol=1e-8, atol=1e-10, args=rhs_args
+            )
+        
+        return result
+    
     def _generate_optimal_glucose(self, t, meal_times):
         """Generate optimal glucose trajectory for healthy individual"""
-        optimal_G = []
-        for time in t:
-            base_glucose = 90  # mg/dL baseline
-            glucose_response = base_glucose
-            
-            for meal_time in meal_times:
-                time_in_day = time % 24
-                if time_in_day >= meal_time:
-                    time_since_meal = time_in_day - meal_time
-                    if time_since_meal <= 4:  # 4-hour post-meal period
-                        # More realistic glucose response curve
-                        peak_time = 1.0  # Peak at 1 hour
-                        if time_since_meal <= peak_time:
-                            # Rising phase
-                            peak_response = 40 * (time_since_meal / peak_time)
-                        else:
-                            # Falling phase
-                            peak_response = 40 * math.exp(-(time_since_meal - peak_time) / 1.5)
-                        glucose_response += peak_response
-            
-            # Add circadian rhythm effect
-            circadian_effect = 5 * math.sin(2 * math.pi * (time % 24) / 24 + math.pi)
-            glucose_response += circadian_effect
-            
-            optimal_G.append(max(70, min(140, glucose_response)))
+        time_in_day = t % 24
+        glucose_response = np.full(t.shape, 90.0)  # mg/dL baseline
+        
+        for meal_time in meal_times:
+            time_since_meal = time_in_day - meal_time
+            # More realistic glucose response curve over the 4-hour post-meal period:
+            # rising to the 1-hour peak, then decaying
+            peak_time = 1.0
+            peak_response = np.where(
+                time_since_meal <= peak_time,
+                40 * (time_since_meal / peak_time),
+                40 * np.exp(-(time_since_meal - peak_time) / 1.5)
+            )
+            post_meal = (time_since_meal >= 0) & (time_since_meal <= 4)
+            glucose_response += np.where(post_meal, peak_response, 0.0)
+        
+        # Add circadian rhythm effect
+        glucose_response += 5 * np.sin(2 * math.pi * time_in_day / 24 + math.pi)
         
-        return optimal_G
+        return np.clip(glucose_response, 70, 140).tolist()
     
     def _get_patient_info(self):
         """Get formatted patient information"""